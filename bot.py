@@ -217,6 +217,7 @@ class Graha(commands.Bot):
         )
         self.command_stats = Counter()
         self.socket_stats = Counter()
+        self.command_types_used = Counter()
         self.global_log: logging.Logger = LOGGER
         self.start_time: datetime.datetime = datetime.datetime.now(datetime.UTC)
 
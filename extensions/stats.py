@@ -12,17 +12,16 @@ import gc
 import io
 import itertools
 import logging
-import operator
 import pathlib
 import re
-import secrets
 import sys
 import textwrap
+import time as _time
 import traceback
-from collections import Counter, defaultdict
 from importlib.metadata import version as metadata_version
 from typing import TYPE_CHECKING, Annotated, Any, TypedDict
 
+import aiohttp
 import asyncpg
 import discord
 import psutil
@@ -36,11 +35,18 @@ from utilities.shared.formats import to_codeblock
 from utilities.shared.paginator import FieldPageSource, RoboPages
 
 if TYPE_CHECKING:
+    from types import TracebackType
+
     from bot import Graha
 
 log = logging.getLogger(__name__)
 
 LOGGING_CHANNEL = 1037306036698230814
+# Discord allows 10 embeds, and 6000 characters across them, per message.
+ERROR_BATCH_MAX_EMBEDS = 10
+ERROR_BATCH_MAX_CHARACTERS = 6000
+ERROR_BATCH_WINDOW = 0.5
+ERROR_FLUSH_TIMEOUT = 10.0
 
 
 class DataBatchEntry(TypedDict):
@@ -66,6 +72,9 @@ class LoggingHandler(logging.Handler):
         self.cog.add_record(record)
 
 
+_COGS_DIRECTORY = str(pathlib.Path(__file__).parent)
+_TASKS_FILE = str(pathlib.Path("discord") / "ext" / "tasks" / "__init__.py")
+
 _INVITE_REGEX = re.compile(r"(?:https?:\/\/)?discord(?:\.gg|\.com|app\.com\/invite)?\/[A-Za-z0-9]+")
 
 
@@ -77,6 +86,28 @@ def hex_value(arg: str) -> int:
     return int(arg, base=16)
 
 
+class PaginatorWriter:
+    """A minimal file-like object that feeds written text into a paginator line by line."""
+
+    __slots__ = ("_buffer", "paginator")
+
+    def __init__(self, paginator: commands.Paginator) -> None:
+        self.paginator: commands.Paginator = paginator
+        self._buffer: str = ""
+
+    def write(self, data: str) -> int:
+        *lines, self._buffer = (self._buffer + data).split("\n")
+        for line in lines:
+            self.paginator.add_line(line)
+
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.paginator.add_line(self._buffer)
+            self._buffer = ""
+
+
 def object_at(addr: int) -> Any | None:
     for o in gc.get_objects():
         if id(o) == addr:
@@ -90,12 +121,18 @@ class Stats(BaseCog["Graha"]):
     def __init__(self, bot: Graha) -> None:
         super().__init__(bot)
         self.process: psutil.Process = psutil.Process()
+        self._last_cpu_percent: float = 0.0
+        self.cpu_sampler.start()
         self._batch_lock = asyncio.Lock()
         self._data_batch: list[DataBatchEntry] = []
         self.bulk_insert_loop.add_exception_type(asyncpg.PostgresConnectionError)
         self.bulk_insert_loop.start()
         self._logging_queue = asyncio.Queue()
         self.logging_worker.start()
+        self._error_queue: asyncio.Queue[discord.Embed] = asyncio.Queue(maxsize=100)
+        self._held_error: discord.Embed | None = None
+        self._error_batch: list[discord.Embed] = []
+        self.error_worker.start()
 
     @property
     def display_emoji(self) -> discord.PartialEmoji:
@@ -124,9 +161,46 @@ class Stats(BaseCog["Graha"]):
                 log.info("Registered %s commands to the database.", total)
             self._data_batch.clear()
 
-    def cog_unload(self) -> None:
+    async def cog_unload(self) -> None:
         self.bulk_insert_loop.stop()
         self.logging_worker.cancel()
+        # let the worker finish the batch it already took off the queue rather than cancelling it mid-send
+        self.error_worker.stop()
+        self.cpu_sampler.cancel()
+
+        # bounded so a rate limited logging webhook can't hold up a reload or shutdown
+        try:
+            await asyncio.wait_for(self.flush_errors(), timeout=ERROR_FLUSH_TIMEOUT)
+        except TimeoutError:
+            log.warning("Timed out sending queued error reports on unload.")
+        finally:
+            self.error_worker.cancel()
+
+    async def flush_errors(self) -> None:
+        task = self.error_worker.get_task()
+        if task and self._error_batch:
+            # stop() ends the loop once this batch is sent, otherwise it is idle on the queue and safe to cancel
+            await task
+        self.error_worker.cancel()
+
+        # send anything still queued rather than dropping it with the worker
+        pending = [self._held_error] if self._held_error else []
+        self._held_error = None
+        while not self._error_queue.empty():
+            pending.append(self._error_queue.get_nowait())
+
+        batch: list[discord.Embed] = []
+        size = 0
+        for embed in pending:
+            if batch and (len(batch) >= ERROR_BATCH_MAX_EMBEDS or size + len(embed) > ERROR_BATCH_MAX_CHARACTERS):
+                await self.send_error_batch(batch)
+                batch, size = [], 0
+
+            batch.append(embed)
+            size += len(embed)
+
+        if batch:
+            await self.send_error_batch(batch)
 
     async def cog_check(self, ctx: Context) -> bool:
         return await ctx.bot.is_owner(ctx.author)
@@ -141,6 +215,58 @@ class Stats(BaseCog["Graha"]):
         record = await self._logging_queue.get()
         await self.send_log_record(record)
 
+    @tasks.loop(seconds=10.0)
+    async def cpu_sampler(self) -> None:
+        # non-blocking, this reports usage since the previous call, i.e. over the last loop interval
+        self._last_cpu_percent = self.process.cpu_percent()
+
+    @tasks.loop(seconds=0.0)
+    async def error_worker(self) -> None:
+        embed = self._held_error or await self._error_queue.get()
+        self._held_error = None
+
+        # kept on the cog so an unload knows a batch is in flight
+        self._error_batch = embeds = [embed]
+        size = len(embed)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ERROR_BATCH_WINDOW
+
+        # errors tend to arrive in bursts, so wait a moment and send whatever arrives as one message
+        while len(embeds) < ERROR_BATCH_MAX_EMBEDS:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            try:
+                embed = await asyncio.wait_for(self._error_queue.get(), timeout=remaining)
+            except TimeoutError:
+                break
+
+            if size + len(embed) > ERROR_BATCH_MAX_CHARACTERS:
+                self._held_error = embed
+                break
+
+            embeds.append(embed)
+            size += len(embed)
+
+        try:
+            await self.send_error_batch(embeds)
+        finally:
+            self._error_batch = []
+
+    async def send_error_batch(self, embeds: list[discord.Embed]) -> None:
+        try:
+            await self.webhook.send(embeds=embeds, wait=False)
+        except (discord.HTTPException, aiohttp.ClientError, OSError) as exc:
+            if len(embeds) == 1:
+                log.warning("Failed to send an error report to the logging webhook: %s", exc)
+                return
+
+            # one bad embed shouldn't take the rest of the batch with it
+            log.warning("Failed to send a batch of %s error reports, retrying individually: %s", len(embeds), exc)
+            for embed in embeds:
+                await self.send_error_batch([embed])
+
     async def register_command(self, ctx: Context) -> None:
         if ctx.command is None:
             return
@@ -304,9 +430,9 @@ class Stats(BaseCog["Graha"]):
         cpu_count = psutil.cpu_count()
         assert cpu_count
 
-        memory_usage = self.process.memory_full_info().uss / 1024**2
-        cpu_usage = self.process.cpu_percent() / cpu_count
-        embed.add_field(name="Process", value=f"{memory_usage:.2f} MiB\n{cpu_usage:.2f}% CPU")
+        memory_usage = self.process.memory_info().rss / 1024**2
+        cpu_usage = self._last_cpu_percent / cpu_count
+        embed.add_field(name="Process", value=f"{memory_usage:.2f} MiB RSS\n{cpu_usage:.2f}% CPU")
 
         version = metadata_version("discord.py")
         embed.add_field(name="Guilds", value=guilds)
@@ -708,6 +834,13 @@ class Stats(BaseCog["Graha"]):
     def add_record(self, record: logging.LogRecord) -> None:
         self._logging_queue.put_nowait(record)
 
+    def add_error(self, embed: discord.Embed) -> None:
+        if self._error_queue.full():
+            # drop the oldest error rather than growing without bound during an outage
+            self._error_queue.get_nowait()
+
+        self._error_queue.put_nowait(embed)
+
     async def send_log_record(self, record: logging.LogRecord) -> None:
         attributes = {"INFO": "\N{INFORMATION SOURCE}\U0000fe0f", "WARNING": "\N{WARNING SIGN}"}
 
@@ -783,12 +916,19 @@ class Stats(BaseCog["Graha"]):
             embed.colour = WARNING
             total_warnings += 1
 
-        all_tasks = asyncio.all_tasks(loop=self.bot.loop)
-        event_tasks = [t for t in all_tasks if "Client._run_event" in repr(t) and not t.done()]
+        event_tasks: list[asyncio.Task[Any]] = []
+        inner_tasks: list[asyncio.Task[Any]] = []
+        for task in asyncio.all_tasks(loop=self.bot.loop):
+            # inspect the coroutine directly, formatting `repr(task)` for every task is far more expensive
+            coro = task.get_coro()
+            code = getattr(coro, "cr_code", None) or getattr(coro, "gi_code", None)
+            filename: str = getattr(code, "co_filename", "")
 
-        cogs_directory = pathlib.Path(__file__).parent
-        tasks_directory = pathlib.Path("discord") / "ext" / "tasks" / "__init__.py"
-        inner_tasks = [t for t in all_tasks if str(cogs_directory) in repr(t) or str(tasks_directory) in repr(t)]
+            if getattr(coro, "__qualname__", "") == "Client._run_event":
+                if not task.done():
+                    event_tasks.append(task)
+            elif filename.startswith(_COGS_DIRECTORY) or filename.endswith(_TASKS_FILE):
+                inner_tasks.append(task)
 
         bad_inner_tasks = ", ".join(hex(id(t)) for t in inner_tasks if t.done() and t._exception is not None)
         total_warnings += bool(bad_inner_tasks)
@@ -802,9 +942,9 @@ class Stats(BaseCog["Graha"]):
         cpu_count = psutil.cpu_count()
         assert cpu_count
 
-        memory_usage = self.process.memory_full_info().uss / 1024**2
-        cpu_usage = self.process.cpu_percent() / cpu_count
-        embed.add_field(name="Process", value=f"{memory_usage:.2f} MiB\n{cpu_usage:.2f}% CPU", inline=False)
+        memory_usage = self.process.memory_info().rss / 1024**2
+        cpu_usage = self._last_cpu_percent / cpu_count
+        embed.add_field(name="Process", value=f"{memory_usage:.2f} MiB RSS\n{cpu_usage:.2f}% CPU", inline=False)
 
         global_rate_limit = not self.bot.http._global_over.is_set()
         description.append(f"Global Rate Limit: {global_rate_limit}")
@@ -834,14 +974,17 @@ class Stats(BaseCog["Graha"]):
             await ctx.send(f"Cancelled task object {task!r}.")
             return
 
-        paginator = commands.Paginator(prefix="```py")
-        fp = io.StringIO()
         frames = len(task.get_stack())
+        if frames == 0 and task.done():
+            await ctx.send(f"Task {task!r} has no active frames.")
+            return
+
+        paginator = commands.Paginator(prefix="```py")
         paginator.add_line(f"# Total Frames: {frames}")
-        task.print_stack(file=fp)
 
-        for line in fp.getvalue().splitlines():
-            paginator.add_line(line)
+        writer = PaginatorWriter(paginator)
+        task.print_stack(file=writer)
+        writer.flush()
 
         for page in paginator.pages:
             await ctx.send(page)
@@ -853,11 +996,15 @@ class Stats(BaseCog["Graha"]):
             await ctx.send("No results found.")
             return
 
-        headers = list(records[0].keys())
-        table = formats.TabularData()
-        table.set_columns(headers)
-        table.add_rows(list(r.values()) for r in records)
-        render = table.render()
+        if len(records) == 1:
+            # no need for column widths with a single row
+            render = "\n".join(f"{key}: {value}" for key, value in records[0].items())
+        else:
+            headers = list(records[0].keys())
+            table = formats.TabularData()
+            table.set_columns(headers)
+            table.add_rows(list(r.values()) for r in records)
+            render = table.render()
 
         fmt = f"```\n{render}\n```"
         if len(fmt) > 2000:
@@ -896,14 +1043,15 @@ class Stats(BaseCog["Graha"]):
                               SUM(CASE WHEN failed THEN 1 ELSE 0 END) AS "failed"
                        FROM commands
                        WHERE command=$1
-                       AND used > (CURRENT_TIMESTAMP - $2::interval)
+                       AND used > $2::timestamptz
                        GROUP BY guild_id
                    ) AS t
                    ORDER BY "total" DESC
                    LIMIT 30;
                 """
 
-        await self.tabulate_query(ctx, query, command, datetime.timedelta(days=days))
+        cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days)
+        await self.tabulate_query(ctx, query, command, cutoff)
 
     @command_history.command(name="guild", aliases=["server"])
     @commands.is_owner()
@@ -951,33 +1099,34 @@ class Stats(BaseCog["Graha"]):
 
         query = """SELECT command, COUNT(*)
                    FROM commands
-                   WHERE used > (CURRENT_TIMESTAMP - $1::interval)
+                   WHERE used > $1::timestamptz
                    GROUP BY command
                    ORDER BY 2 DESC
                 """
 
-        all_commands = {c.qualified_name: 0 for c in self.bot.walk_commands()}
+        all_commands = {c.qualified_name for c in self.bot.walk_commands()}
 
-        records = await ctx.db.fetch(query, datetime.timedelta(days=days))
-        for name, uses in records:
-            if name in all_commands:
-                all_commands[name] = uses
+        cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days)
+        records = await ctx.db.fetch(query, cutoff)
 
-        as_data = sorted(all_commands.items(), key=operator.itemgetter(1), reverse=True)
+        # records are already ordered by uses, so appending the unused commands keeps the table sorted
+        used = [(name, uses) for name, uses in records if name in all_commands]
+        unused_names = sorted(all_commands.difference(name for name, _ in used))
+        as_data = used + [(name, 0) for name in unused_names]
         table = formats.TabularData()
         table.set_columns(["Command", "Uses"])
         table.add_rows(tup for tup in as_data)
         render = table.render()
 
         embed = discord.Embed(title="Summary", colour=discord.Colour.green())
-        embed.set_footer(text="Since").timestamp = discord.utils.utcnow() - datetime.timedelta(days=days)
+        embed.set_footer(text="Since").timestamp = cutoff
 
         top_ten = "\n".join(f"{command}: {uses}" for command, uses in records[:10])
         bottom_ten = "\n".join(f"{command}: {uses}" for command, uses in records[-10:])
         embed.add_field(name="Top 10", value=top_ten)
         embed.add_field(name="Bottom 10", value=bottom_ten)
 
-        unused = ", ".join(name for name, uses in as_data if uses == 0)
+        unused = ", ".join(unused_names)
         if len(unused) > 1024:
             unused = "Way too many..."
 
@@ -990,7 +1139,7 @@ class Stats(BaseCog["Graha"]):
     async def command_history_cog(self, ctx: Context, days: int = 7, *, cog_name: str | None = None) -> None:
         """Command history for a cog or grouped by a cog."""
 
-        interval = datetime.timedelta(days=days)
+        cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days)
         if cog_name is not None:
             cog = self.bot.get_cog(cog_name)
             if cog is None:
@@ -1004,72 +1153,89 @@ class Stats(BaseCog["Graha"]):
                                   SUM(CASE WHEN failed THEN 1 ELSE 0 END) AS "failed"
                            FROM commands
                            WHERE command = any($1::text[])
-                           AND used > (CURRENT_TIMESTAMP - $2::interval)
+                           AND used > $2::timestamptz
                            GROUP BY command
                        ) AS t
                        ORDER BY "total" DESC
                        LIMIT 30;
                     """
-            return await self.tabulate_query(ctx, query, [c.qualified_name for c in cog.walk_commands()], interval)
-
-        # A more manual query with a manual grouper.
-        query = """SELECT *, t.success + t.failed AS "total"
-                   FROM (
-                       SELECT command,
-                              SUM(CASE WHEN failed THEN 0 ELSE 1 END) AS "success",
-                              SUM(CASE WHEN failed THEN 1 ELSE 0 END) AS "failed"
-                       FROM commands
-                       WHERE used > (CURRENT_TIMESTAMP - $1::interval)
-                       GROUP BY command
-                   ) AS t;
+            return await self.tabulate_query(ctx, query, [c.qualified_name for c in cog.walk_commands()], cutoff)
+
+        # Resolve each command to its cog up front and let Postgres do the grouping.
+        # Commands we no longer know about (or that have no cog) fall into "No Cog".
+        mapping = [(c.qualified_name, c.cog.qualified_name if c.cog else "No Cog") for c in self.bot.walk_commands()]
+        command_names = [command for command, _ in mapping]
+        cog_names = [cog for _, cog in mapping]
+
+        query = """SELECT COALESCE(m.cog, 'No Cog') AS "Cog",
+                          SUM(CASE WHEN c.failed THEN 0 ELSE 1 END) AS "Success",
+                          SUM(CASE WHEN c.failed THEN 1 ELSE 0 END) AS "Failed",
+                          COUNT(*) AS "Total"
+                   FROM commands c
+                   LEFT JOIN unnest($1::text[], $2::text[]) AS m(command, cog) ON c.command = m.command
+                   WHERE c.used > $3::timestamptz
+                   GROUP BY 1
+                   ORDER BY "Total" DESC;
                 """
 
-        class Count:
-            __slots__ = ("failed", "success", "total")
-
-            def __init__(self) -> None:
-                self.success = 0
-                self.failed = 0
-                self.total = 0
-
-            def add(self, record: dict[str, int]) -> None:
-                self.success += record["success"]
-                self.failed += record["failed"]
-                self.total += record["total"]
-
-        data = defaultdict(Count)
-        records = await ctx.db.fetch(query, interval)
-        for record in records:
-            command = self.bot.get_command(record["command"])
-            if command is None or command.cog is None:
-                data["No Cog"].add(record)
-            else:
-                data[command.cog.qualified_name].add(record)
+        return await self.tabulate_query(ctx, query, command_names, cog_names, cutoff)
 
-        table = formats.TabularData()
-        table.set_columns(["Cog", "Success", "Failed", "Total"])
-        data = sorted(
-            [(cog, e.success, e.failed, e.total) for cog, e in data.items()],
-            key=operator.itemgetter(-1),
-            reverse=True,
-        )
 
-        table.add_rows(data)
-        render = table.render()
-        await ctx.send(f"```\n{render}\n```")
-        return None
+old_on_error = commands.Bot.on_error
 
+# per chained exception: (type, message, (filename, line number) per frame) -> (formatted at, formatted traceback)
+_TRACEBACK_CACHE: dict[tuple[tuple[type[BaseException], str, tuple[tuple[str, int], ...]], ...], tuple[float, str]] = {}
+_TRACEBACK_CACHE_SIZE = 32
+_TRACEBACK_CACHE_TTL = 5.0
 
-old_on_error = commands.Bot.on_error
+
+def _format_event_traceback(exception: BaseException | None, tb: TracebackType | None) -> str:
+    if exception is None or tb is None:
+        return "".join(traceback.format_exception_only(exception))
+
+    # every frame of every chained exception, a shared helper raising the same error for different callers
+    # (or with a different cause) must not share a traceback
+    key_parts: list[tuple[type[BaseException], str, tuple[tuple[str, int], ...]]] = []
+    seen: set[int] = set()
+    chained: BaseException | None = exception
+    while chained is not None and id(chained) not in seen:
+        seen.add(id(chained))
+
+        frames: list[tuple[str, int]] = []
+        current = chained.__traceback__ if chained is not exception else tb
+        while current is not None:
+            frames.append((current.tb_frame.f_code.co_filename, current.tb_lineno))
+            current = current.tb_next
+
+        key_parts.append((type(chained), str(chained), tuple(frames)))
+        chained = chained.__cause__ or chained.__context__
+
+    key = tuple(key_parts)
+    now = _time.monotonic()
+
+    # error storms tend to raise the same error from the same place, don't re-walk and re-read the frames for each
+    cached = _TRACEBACK_CACHE.get(key)
+    if cached and now - cached[0] < _TRACEBACK_CACHE_TTL:
+        return cached[1]
+
+    clean = "".join(traceback.TracebackException(type(exception), exception, tb, lookup_lines=True).format())
+
+    _TRACEBACK_CACHE.pop(key, None)
+    if len(_TRACEBACK_CACHE) >= _TRACEBACK_CACHE_SIZE:
+        del _TRACEBACK_CACHE[next(iter(_TRACEBACK_CACHE))]
+    _TRACEBACK_CACHE[key] = (now, clean)
+
+    return clean
 
 
 async def on_error(self: Graha, event: str, *args: Any, **kwargs: Any) -> None:
-    (exception_type, exception, tb) = sys.exc_info()
-    ray_id = secrets.token_hex(16)
+    (_, exception, tb) = sys.exc_info()
+    # only needs to be unique within this process' logs, no need to hit the OS CSPRNG for it
+    ray_id = f"{_time.monotonic_ns():016x}"
 
     embed = discord.Embed(title="Event Error", colour=discord.Colour.brand_red())
     embed.add_field(name="Event", value=event)
-    clean = "".join(traceback.format_exception(exception_type, exception, tb))
+    clean = _format_event_traceback(exception, tb)
     embed.description = formats.to_codeblock(clean, escape_md=False)
     embed.set_footer(text=f"Ray ID: {ray_id}")
     embed.timestamp = datetime.datetime.now(datetime.UTC)
@@ -1080,19 +1246,15 @@ async def on_error(self: Graha, event: str, *args: Any, **kwargs: Any) -> None:
     fmt.append("```")
     embed.add_field(name="Arguments", value="\n".join(fmt), inline=False)
 
-    await self.logging_webhook.send(embed=embed, wait=False)
-
+    cog: Stats | None = self.get_cog("Stats")  # pyright: ignore[reportAssignmentType] # cog downcasting
+    if cog is None:
+        await self.logging_webhook.send(embed=embed, wait=False)
+        return
 
-async def setup(bot: Graha) -> None:
-    if not hasattr(bot, "command_stats"):
-        bot.command_stats = Counter()
+    cog.add_error(embed)
 
-    if not hasattr(bot, "socket_stats"):
-        bot.socket_stats = Counter()
-
-    if not hasattr(bot, "command_types_used"):
-        bot.command_types_used = Counter()
 
+async def setup(bot: Graha) -> None:
     cog = Stats(bot)
     await bot.add_cog(cog)
     bot._stats_cog_gateway_handler = handler = LoggingHandler(cog)
@@ -5,8 +5,8 @@ import datetime
 import logging
 from typing import TYPE_CHECKING, Any, ClassVar
 
+import asyncpg
 import discord
-from asyncpg import BitString
 from discord import SelectOption, app_commands
 from discord.ext import commands, tasks
 from discord.utils import MISSING
@@ -19,7 +19,6 @@ from utilities.containers.event_subscription import (
 )
 from utilities.exceptions import NoSubmissionFound
 from utilities.flags import SubscribedEventsFlags
-from utilities.shared.cache import cache
 from utilities.shared.cog import BaseCog
 from utilities.shared.converters import WebhookTransformer  # noqa: TC001
 from utilities.shared.ui import BaseView
@@ -37,11 +36,25 @@ if TYPE_CHECKING:
     from extensions.resets import Resets as ResetsCog
     from extensions.triple_triad import TripleTriad
     from utilities.context import Interaction
-    from utilities.shared._types.xiv.record_aliases.subscription import (
-        EventRecord as SubscriptionEventRecord,
-    )
 
 LOGGER = logging.getLogger(__name__)
+MAX_CONCURRENT_DISPATCHES = 64
+WEEKLY_REMINDER_WEEKDAY = 1  # tuesday
+FASHION_REPORT_REMINDER_WEEKDAY = 4  # friday
+FASHION_REPORT_REMINDER_TIME = datetime.time(hour=8, minute=30, tzinfo=datetime.UTC)
+# only bounds the before-loop waits, the 7 day intervals of the weekly loops after their first run are slept by
+# tasks.loop itself on the monotonic clock, so those can still run late after the host is suspended
+MAX_SLEEP_CHUNK = 600.0
+OCEAN_FISHING_CONTENT = (
+    "You can view Lulu's helpful tools on Ocean Fishing data [here](https://ffxiv.pf-n.co/ocean-fishing)!"
+)
+
+
+async def _sleep_until(when: datetime.datetime, /) -> None:
+    # a single multi-day sleep runs on the monotonic clock and wakes late if the host is suspended,
+    # so sleep in chunks and re-check the wall clock between them
+    while (remaining := (when - datetime.datetime.now(datetime.UTC)).total_seconds()) > 0:  # noqa: ASYNC110 # polling the wall clock is the point
+        await asyncio.sleep(min(remaining, MAX_SLEEP_CHUNK))
 
 
 class NoFashionReportPost(Exception):
@@ -84,27 +97,22 @@ class EventSubView(BaseView):
         assert interaction.guild  # guarded in earlier check
         await interaction.response.defer()
 
-        config = await self.cog.get_sub_config(interaction.guild.id)
-
-        resolved_flags = SubscribedEventsFlags._from_value(sum(map(int, self.sub_selection.values)))
+        # the values are single flag bits, OR them together rather than summing so duplicates can't corrupt the mask.
+        value = 0
+        for flag in self.sub_selection.values:
+            value |= int(flag)
 
-        if isinstance(interaction.channel, discord.Thread):
-            current_channel = interaction.channel.parent
-        else:
-            current_channel = interaction.channel
+        resolved_flags = SubscribedEventsFlags._from_value(value)
 
-        assert current_channel  # this should never happen
-        config.channel_id = current_channel.id
+        channel = interaction.channel
+        assert channel  # this should never happen
 
-        if isinstance(interaction.channel, discord.Thread) and isinstance(interaction.channel.parent, discord.TextChannel):
-            channel_id = interaction.channel.parent.id
-            thread_id = interaction.channel.id
+        if isinstance(channel, discord.Thread):
+            channel_id, thread_id = channel.parent_id, channel.id
         else:
-            channel_id = current_channel.id
-            thread_id = None
+            channel_id, thread_id = channel.id, None
 
         await self.cog._set_subscriptions(interaction.guild.id, resolved_flags, channel_id, thread_id)
-        self.cog.get_sub_config.invalidate(self.cog, interaction.guild.id)
 
         content = "Your subscription choices have been recorded, thank you!"
 
@@ -131,90 +139,92 @@ class EventSubView(BaseView):
 
 
 class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
-    POSSIBLE_SUBSCRIPTIONS: ClassVar[list[discord.SelectOption]] = [
-        discord.SelectOption(
-            label="Daily Resets",
-            value="1",
-            description="Opt into reminders about daily resets!",
-            emoji="\U0001f4bf",
+    # each entry is the label, flag value, description and emoji of one select option
+    POSSIBLE_SUBSCRIPTIONS: ClassVar[tuple[tuple[str, int, str, str], ...]] = (
+        ("Daily Resets", SubscribedEventsFlags.daily_resets.flag, "Opt into reminders about daily resets!", "\U0001f4bf"),
+        ("Weekly Resets", SubscribedEventsFlags.weekly_resets.flag, "Opt into reminders about weekly resets!", "\U0001f4c0"),
+        (
+            "Fashion Report",
+            SubscribedEventsFlags.fashion_report.flag,
+            "Opt into reminders about Fashion Report check-ins and information from Gottesstrafe when available!",
+            "\U00002728",
         ),
-        discord.SelectOption(
-            label="Weekly Resets",
-            value="2",
-            description="Opt into reminders about weekly resets!",
-            emoji="\U0001f4c0",
+        (
+            "Ocean Fishing",
+            SubscribedEventsFlags.ocean_fishing.flag,
+            "Opt into reminders about Ocean Fishing expeditions!",
+            "\U0001f41f",
         ),
-        discord.SelectOption(
-            label="Fashion Report",
-            value="4",
-            description=(
-                "Opt into reminders about Fashion Report check-ins and information from Gottesstrafe when available!"
-            ),
-            emoji="\U00002728",
+        (
+            "Jumbo Cactpot NA",
+            SubscribedEventsFlags.jumbo_cactpot_na.flag,
+            "Opt into reminders about Jumbo Cactpot callouts for NA datacenters.",
+            "\U0001f340",
         ),
-        discord.SelectOption(
-            label="Ocean Fishing",
-            value="8",
-            description="Opt into reminders about Ocean Fishing expeditions!",
-            emoji="\U0001f41f",
+        (
+            "Jumbo Cactpot EU",
+            SubscribedEventsFlags.jumbo_cactpot_eu.flag,
+            "Opt into reminders about Jumbo Cactpot callouts for EU datacenters.",
+            "\U0001f340",
         ),
-        discord.SelectOption(
-            label="Jumbo Cactpot NA",
-            value="16",
-            description="Opt into reminders about Jumbo Cactpot callouts for NA datacenters.",
-            emoji="\U0001f340",
+        (
+            "Jumbo Cactpot JP",
+            SubscribedEventsFlags.jumbo_cactpot_jp.flag,
+            "Opt into reminders about Jumbo Cactpot callouts for JP datacenters.",
+            "\U0001f340",
         ),
-        discord.SelectOption(
-            label="Jumbo Cactpot EU",
-            value="32",
-            description="Opt into reminders about Jumbo Cactpot callouts for EU datacenters.",
-            emoji="\U0001f340",
+        (
+            "Jumbo Cactpot OCE",
+            SubscribedEventsFlags.jumbo_cactpot_oce.flag,
+            "Opt into reminders about Jumbo Cactpot callouts for OCE datacenters.",
+            "\U0001f340",
         ),
-        discord.SelectOption(
-            label="Jumbo Cactpot JP",
-            value="64",
-            description="Opt into reminders about Jumbo Cactpot callouts for JP datacenters.",
-            emoji="\U0001f340",
+        ("GATEs", SubscribedEventsFlags.gate.flag, "Opt into reminders about GATE events opening.", "\U0001f3b2"),
+        (
+            "Triple Triad Open Tournaments",
+            SubscribedEventsFlags.open_tournament.flag,
+            "Opt into reminders about TT Open Tournament signups.",
+            "\U00002663\U0000fe0f",
         ),
-        discord.SelectOption(
-            label="Jumbo Cactpot OCE",
-            value="128",
-            description="Opt into reminders about Jumbo Cactpot callouts for OCE datacenters.",
-            emoji="\U0001f340",
+        (
+            "Triple Triad Tournaments",
+            SubscribedEventsFlags.triple_tournament_tournament.flag,
+            "Opt into reminders about TT Tournament signups.",
+            "\U0001f3c6",
         ),
-        discord.SelectOption(
-            label="GATEs",
-            value="256",
-            description="Opt into reminders about GATE events opening.",
-            emoji="\U0001f3b2",
-        ),
-        discord.SelectOption(
-            label="Triple Triad Open Tournaments",
-            value="512",
-            description="Opt into reminders about TT Open Tournament signups.",
-            emoji="\U00002663\U0000fe0f",
-        ),
-        discord.SelectOption(
-            label="Triple Triad Tournaments",
-            value="1024",
-            description="Opt into reminders about TT Tournament signups.",
-            emoji="\U0001f3c6",
-        ),
-    ]
+    )
     __cog_is_app_commands_group__ = True
 
     def __init__(self, bot: Graha, /) -> None:
         self.bot: Graha = bot
         self.avatar_url: str = "https://static.abstractumbra.dev/images/graha.png"
+        self._config_cache: dict[int, EventSubConfig] = {}
+        self._pending_webhooks: list[tuple[int, int, str, str | None]] = []
+        self._pending_deletions: set[int] = set()
+        # shared by every loop so overlapping ticks stay within one bound together
+        dispatch_limit = self.bot.config.get("subscriptions", {}).get("max_concurrent_dispatches", MAX_CONCURRENT_DISPATCHES)
+        if dispatch_limit < 1:
+            # a zero semaphore would block every send forever and a negative one can't be created at all
+            LOGGER.warning(
+                "[EventSub] -> [Config] :: max_concurrent_dispatches must be at least 1, got %r. Using 1.",
+                dispatch_limit,
+            )
+            dispatch_limit = 1
+        self._dispatch_semaphore: asyncio.Semaphore = asyncio.Semaphore(dispatch_limit)
+        self.fashion_report_loop.add_exception_type(NoSubmissionFound)
+
+    async def cog_load(self) -> None:
+        # this is the snapshot every reminder tick reads from, the write paths below keep it current
+        configs = await EventSubConfig.fetch_all(self.bot)
+        self._config_cache = {config.guild_id: config for config in configs}
+
+        # started only once the snapshot exists, a failed load must not leave orphaned loops running
         self.daily_reset_loop.start()
         self.weekly_reset_loop.start()
-        self.fashion_report_loop.add_exception_type(NoSubmissionFound)
         self.fashion_report_loop.start()
         self.ocean_fishing_loop.start()
         self.jumbo_cactpot_loop.start()
         self.gate_loop.start()
-        self.open_tournament_loop.start()
-        self.tt_tournament_loop.start()
 
     async def cog_unload(self) -> None:
         self.daily_reset_loop.cancel()
@@ -223,8 +233,7 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
         self.ocean_fishing_loop.cancel()
         self.jumbo_cactpot_loop.cancel()
         self.gate_loop.cancel()
-        self.open_tournament_loop.cancel()
-        self.tt_tournament_loop.cancel()
+        self._config_cache.clear()
 
     async def _set_subscriptions(
         self,
@@ -233,76 +242,111 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
         channel_id: int | None = None,
         thread_id: int | None = None,
     ) -> None:
+        # this config may be the live one reminder ticks dispatch from, so it is only updated once the write succeeds
+        config = await self.get_sub_config(guild_id)
+
+        # resolve the webhook up front (creating it on Discord's end if needed) so both rows are written together
+        # a webhook created by a tick may not be stored yet, reuse it rather than creating a second one
+        webhook = config._webhook or await config._fetch_webhook()
+        if not webhook:
+            channel: discord.TextChannel | None = self.bot.get_channel(channel_id) if channel_id else None  # pyright: ignore[reportAssignmentType] # only TextChannel input accepted
+            webhook = await config._create_webhook(channel=channel)
+
+        # one statement writes both rows atomically in a single round-trip, the webhook row keys off the upsert
         query = """
-                INSERT INTO event_remind_subscriptions
-                    (guild_id, subscriptions, channel_id, thread_id)
-                VALUES
-                    ($1, $2, $3, $4)
+                WITH subscription AS (
+                    INSERT INTO event_remind_subscriptions
+                        (guild_id, subscriptions, channel_id, thread_id, webhook_id)
+                    VALUES
+                        ($1, $2, $3, $4, $5)
+                    ON CONFLICT
+                        (guild_id)
+                    DO UPDATE SET
+                        subscriptions = EXCLUDED.subscriptions,
+                        channel_id = EXCLUDED.channel_id,
+                        thread_id = EXCLUDED.thread_id,
+                        webhook_id = EXCLUDED.webhook_id
+                    RETURNING guild_id, webhook_id
+                )
+                INSERT INTO webhooks
+                    (guild_id, webhook_id, webhook_url, webhook_token)
+                SELECT guild_id, webhook_id, $6, $7
+                FROM subscription
                 ON CONFLICT
                     (guild_id)
                 DO UPDATE SET
-                    subscriptions = EXCLUDED.subscriptions,
-                    channel_id = EXCLUDED.channel_id,
-                    thread_id = EXCLUDED.thread_id;
+                    webhook_id = EXCLUDED.webhook_id,
+                    webhook_url = EXCLUDED.webhook_url,
+                    webhook_token = EXCLUDED.webhook_token;
                 """
 
-        subscription_bits = subscriptions.to_bitstring()
         await self.bot.pool.execute(
             query,
             guild_id,
-            subscription_bits,
+            subscriptions.to_bitstring(),
             channel_id,
             thread_id,
+            webhook.id,
+            webhook.url,
+            webhook.token,
         )
-        config = await self.get_sub_config(guild_id)
-        webhook = await config.get_webhook()
-
-        webhook_query = """
-                        WITH sub_update AS (
-                            UPDATE event_remind_subscriptions
-                                SET webhook_id = $1
-                                WHERE guild_id = $2
-                            RETURNING guild_id
-                        )
-                        INSERT INTO webhooks
-                            (guild_id, webhook_id, webhook_url, webhook_token)
-                        SELECT
-                            sub_update.guild_id, $1, $3, $4
-                        FROM sub_update
-                        ON CONFLICT
-                            (guild_id)
-                        DO UPDATE SET
-                            webhook_id = EXCLUDED.webhook_id,
-                            webhook_url = EXCLUDED.webhook_url,
-                            webhook_token = EXCLUDED.webhook_token;
-                        """
-        await self.bot.pool.execute(webhook_query, webhook.id, guild_id, webhook.url, webhook.token)
-
-        self.get_sub_config.invalidate(self, guild_id)
+
+        config.subscriptions = subscriptions
+        config.channel_id = channel_id
+        config.thread_id = thread_id
+        config.webhook_id = webhook.id
+        config._webhook = webhook
+        config.get_webhook.invalidate(config)
+        self._config_cache[guild_id] = config
+        # the rows were just written above, a later flush must not overwrite or delete them
+        self._pending_webhooks = [row for row in self._pending_webhooks if row[0] != guild_id]
+        self._pending_deletions.discard(guild_id)
 
     async def _delete_subscription(self, config: EventSubConfig) -> None:
+        # drop it from the cache first so a tick running during the delete doesn't dispatch to it
+        self._config_cache.pop(config.guild_id, None)
+
         await config.delete()
         LOGGER.info("[EventSub] -> [Delete] :: From guild: %r", config.guild_id)
 
-        self.get_sub_config.invalidate(self, config.guild_id)
+    def _queue_deletion(self, config: EventSubConfig) -> None:
+        # deleted together at the end of handle_dispatch so a tick with many broken subscriptions is one query
+        self._pending_deletions.add(config.guild_id)
+        self._config_cache.pop(config.guild_id, None)
+
+    async def _flush_pending_deletions(self, guild_ids: list[int]) -> None:
+        # guilds that saved a new selection since being queued are back in the cache and must be kept
+        guild_ids = [guild_id for guild_id in guild_ids if guild_id not in self._config_cache]
+        if not guild_ids:
+            return
 
-    @cache(ignore_kwargs=True)
-    async def get_sub_config(self, guild_id: int, *, webhook: discord.Webhook | None = None) -> EventSubConfig:
         query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE guild_id = $1;
+                DELETE FROM event_remind_subscriptions
+                WHERE guild_id = ANY($1::bigint[]);
                 """
 
-        record: SubscriptionEventRecord | None = await self.bot.pool.fetchrow(query, guild_id)  # pyright: ignore[reportAssignmentType] # wish I knew how to make a Record subclass
+        await self.bot.pool.execute(query, guild_ids)
+        LOGGER.info("[EventSub] -> [Delete] :: From guilds: %r", guild_ids)
 
-        if not record:
-            LOGGER.info("[EventSub] -> [Create] :: Creating new subscription config for guild: %s", guild_id)
-            if webhook:
-                return EventSubConfig.with_webhook(self.bot, guild_id=guild_id, webhook=webhook)
-            return EventSubConfig(self.bot, guild_id=guild_id)
+    async def get_sub_config(self, guild_id: int, *, webhook: discord.Webhook | None = None) -> EventSubConfig:
+        # every stored subscription is loaded in cog_load and kept current by the write paths above
+        try:
+            return self._config_cache[guild_id]
+        except KeyError:
+            pass
+
+        LOGGER.info("[EventSub] -> [Create] :: Creating new subscription config for guild: %s", guild_id)
+        if webhook:
+            config = EventSubConfig.with_webhook(self.bot, guild_id=guild_id, webhook=webhook)
+        else:
+            config = EventSubConfig(self.bot, guild_id=guild_id)
+
+        # only stored once a selection is saved in _set_subscriptions, so guilds that never subscribe aren't kept
+        return config
 
-        return EventSubConfig.from_record(self.bot, record=record)
+    def _subscribed_configs(self, flags: int) -> list[EventSubConfig]:
+        # the cache holds every stored subscription, so reminder ticks never need to query for their subscribers
+        return [config for config in self._config_cache.values() if config.subscriptions.value & flags]
 
     async def _resolve_webhook_from_cache(
         self,
@@ -311,20 +355,55 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
         log_key: str = "[General Access]",
     ) -> discord.Webhook | None:
         try:
-            wh = await config.get_webhook()
+            if config._webhook:
+                return config._webhook
+
+            # cached configs are loaded with a join against webhooks, so no webhook here means there is no row for this guild
+            # create it on Discord's end now and store the row alongside the others in handle_dispatch
+            async with self._dispatch_semaphore:
+                wh = await config._create_webhook()
         except MisconfiguredSubscription:
             LOGGER.exception("[EventSub] -> [Delete] %s :: Subscription %r is misconfigured. Deleting.", log_key, config)
-            await self._delete_subscription(config)
+            self._queue_deletion(config)
+            return None
+        except discord.HTTPException as exc:
+            # e.g. missing permissions or the channel's webhook limit, skip this guild without failing the whole tick
+            LOGGER.warning("[EventSub] -> [Webhooks] %s :: Could not create a webhook for %r: %s", log_key, config, exc)
             return None
 
+        config.webhook_id = wh.id
+        config._webhook = wh
+        self._pending_webhooks.append((config.guild_id, wh.id, wh.url, wh.token))
         return wh
 
-    @commands.Cog.listener()
-    async def on_guild_leave(self, guild: discord.Guild) -> None:
-        config = await self.get_sub_config(guild.id)
+    async def _resolve_webhooks(
+        self,
+        configs: list[EventSubConfig],
+        *,
+        log_key: str,
+    ) -> list[tuple[EventSubConfig, discord.Webhook]]:
+        # most configs already carry their webhook, the rest need a Discord request each so resolve them together
+        webhooks = await asyncio.gather(*(self._resolve_webhook_from_cache(conf, log_key=log_key) for conf in configs))
+        return [(conf, webhook) for conf, webhook in zip(configs, webhooks, strict=True) if webhook]
 
-        await config.delete()
-        self.get_sub_config.invalidate(self, guild.id)
+    async def _flush_pending_webhooks(self, rows: list[tuple[int, int, str, str | None]]) -> None:
+        query = """
+                INSERT INTO webhooks (guild_id, webhook_id, webhook_url, webhook_token)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (guild_id)
+                    DO UPDATE SET
+                        webhook_id = EXCLUDED.webhook_id,
+                        webhook_url = EXCLUDED.webhook_url,
+                        webhook_token = EXCLUDED.webhook_token;
+                """
+
+        await self.bot.pool.executemany(query, rows)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        config = self._config_cache.pop(guild.id, None)
+        if config:
+            await config.delete()
 
     @app_commands.command(name="select")
     @app_commands.guild_only()
@@ -349,10 +428,12 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
 
         config = await self.get_sub_config(interaction.guild.id, webhook=webhook)
 
-        options = self.POSSIBLE_SUBSCRIPTIONS[:]
-
-        for (_, value), option in zip(config.subscriptions, options, strict=False):
-            option.default = value
+        # build fresh options each time, these are per-guild and must not be shared between invocations.
+        subscribed = config.subscriptions.value
+        options = [
+            SelectOption(label=label, value=str(flag), description=description, emoji=emoji, default=bool(flag & subscribed))
+            for label, flag, description, emoji in self.POSSIBLE_SUBSCRIPTIONS
+        ]
 
         view = EventSubView(author=interaction.user, options=options, cog=self)
         return await interaction.followup.send(
@@ -411,24 +492,69 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
         try:
             await webhook.send(content=content, embeds=embeds, thread=config.thread, avatar_url=self.avatar_url)
         except (discord.NotFound, MisconfiguredSubscription):
-            await self._delete_subscription(config)
+            self._queue_deletion(config)
 
-    async def handle_dispatch(self, to_dispatch: list[Coroutine[Any, Any, None]]) -> None:
-        await asyncio.gather(*to_dispatch, return_exceptions=False)
+    def _resolve_next_bihourly_warning(self) -> datetime.datetime:
+        now = datetime.datetime.now(datetime.UTC)
+        then = now + datetime.timedelta(hours=1) if now.hour % 2 == 0 else now
+
+        if then.minute >= 45:
+            # exceeded warning time, alert on next
+            then += datetime.timedelta(hours=2)
+        return then.replace(minute=45, second=0, microsecond=0)
+
+    def _resolve_next_weekly(self, weekday: int, time: datetime.time, /) -> datetime.datetime:
+        now = datetime.datetime.now(datetime.UTC)
+        then = datetime.datetime.combine(now.date(), time) + datetime.timedelta(days=(weekday - now.weekday()) % 7)
+        if then <= now:
+            then += datetime.timedelta(weeks=1)
 
-        # TODO handle exceptions cleanly?
+        return then
+
+    async def handle_dispatch(self, to_dispatch: list[Coroutine[Any, Any, None]]) -> None:
+        # bound the concurrent sends so aiohttp can reuse its pooled connections instead of opening one per guild
+        async def _run(coro: Coroutine[Any, Any, None], /) -> None:
+            async with self._dispatch_semaphore:
+                await coro
+
+        results = await asyncio.gather(*(_run(coro) for coro in to_dispatch), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                LOGGER.error("[EventSub] -> [Dispatch] :: Failed to dispatch a reminder.", exc_info=result)
+
+        # bookkeeping happens after the sends so a failed write can't hold up or cancel the reminders themselves
+        await self._flush_pending()
+
+    async def _flush_pending(self) -> None:
+        if self._pending_webhooks:
+            # rows for guilds deleted since the webhook was created would only violate the foreign key
+            pending = [row for row in self._pending_webhooks if row[0] in self._config_cache]
+            self._pending_webhooks = []
+            if pending:
+                LOGGER.info("[EventSub] -> [Webhooks] :: Storing %s newly created webhooks.", len(pending))
+                try:
+                    await self._flush_pending_webhooks(pending)
+                except (asyncpg.PostgresError, OSError):
+                    LOGGER.exception(
+                        "[EventSub] -> [Webhooks] :: Failed to store %s webhooks, retrying next tick.", len(pending)
+                    )
+                    self._pending_webhooks.extend(pending)
+
+        if self._pending_deletions:
+            deletions, self._pending_deletions = list(self._pending_deletions), set()
+            try:
+                await self._flush_pending_deletions(deletions)
+            except (asyncpg.PostgresError, OSError):
+                LOGGER.exception(
+                    "[EventSub] -> [Delete] :: Failed to delete %s subscriptions, retrying next tick.", len(deletions)
+                )
+                self._pending_deletions.update(deletions)
 
     @tasks.loop(time=DAILY_RESET_REMINDER_TIME)
     async def daily_reset_loop(self) -> None:
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(1, length=64))  # pyright: ignore[reportAssignmentType] # stub shenanigans
+        configs = self._subscribed_configs(flags=SubscribedEventsFlags.daily_resets.flag)
 
-        if not records:
+        if not configs:
             LOGGER.warning("[EventSub] -> [DailyReset] :: No subscriptions. Exiting.")
             return
 
@@ -439,71 +565,68 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
             return
 
         embed = resets_cog._get_daily_reset_embed()
+        embeds = [embed]
 
-        to_send: list[Coroutine[Any, Any, None]] = []
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="[(DailyReset)]")
-
-            if not webhook:
-                continue
-
-            to_send.append(self.dispatcher(webhook=webhook, embeds=[embed], config=conf))
+        to_send = [
+            self.dispatcher(webhook=webhook, embeds=embeds, config=conf)
+            for conf, webhook in await self._resolve_webhooks(configs, log_key="[(DailyReset)]")
+        ]
 
         await self.handle_dispatch(to_send)
 
-    @tasks.loop(time=WEEKLY_RESET_REMINDER_TIME)
+    @tasks.loop(hours=24 * 7)
     async def weekly_reset_loop(self) -> None:
-        now = datetime.datetime.now(datetime.UTC)
-        if now.weekday() != 1:  # tuesday
-            return
-
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(2, length=64))  # pyright: ignore[reportAssignmentType] # stub shenanigans
+        # the weekly reset and TT tournament reminders share a schedule, so fetch both sets of subscribers at once
+        configs = self._subscribed_configs(
+            flags=SubscribedEventsFlags.weekly_resets.flag | SubscribedEventsFlags.triple_tournament_tournament.flag,
+        )
 
-        if not records:
+        if not configs:
             LOGGER.warning("[EventSub] -> [WeeklyReset] :: No subscriptions. Exiting.")
             return
 
-        resets_cog: ResetsCog | None = self.bot.get_cog("Reset Information")  # pyright: ignore[reportAssignmentType] # cog downcasting
+        now = datetime.datetime.now(datetime.UTC)
+        weekly_embeds: list[discord.Embed] = []
+        tournament_embeds: list[discord.Embed] = []
 
-        if not resets_cog:
+        resets_cog: ResetsCog | None = self.bot.get_cog("Reset Information")  # pyright: ignore[reportAssignmentType] # cog downcasting
+        if resets_cog:
+            weekly_embeds.append(resets_cog._get_weekly_reset_embed())
+        else:
             LOGGER.error("[EventSub] -> [WeeklyReset] :: Resets cog is not available.")
+
+        tt_cog: TripleTriad | None = self.bot.get_cog("TripleTriad")  # pyright: ignore[reportAssignmentType] # cog downcasting
+        if tt_cog:
+            tournament_embeds.append(tt_cog.generate_tournament_embed(now))
+        else:
+            LOGGER.error("[EventSub] -> [TT Tournament] :: Could not load the Triple Triad cog.")
+
+        if not weekly_embeds and not tournament_embeds:
             return
 
-        embed = resets_cog._get_weekly_reset_embed()
+        # guilds subscribed to both get a single message carrying both embeds
+        both_embeds = weekly_embeds + tournament_embeds
 
         to_send: list[Coroutine[Any, Any, None]] = []
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="[(WeeklyReset)]")
-
-            if not webhook:
-                continue
+        for conf, webhook in await self._resolve_webhooks(configs, log_key="[(WeeklyReset)]"):
+            weekly = conf.subscriptions.weekly_resets
+            tournament = conf.subscriptions.triple_tournament_tournament
+            if weekly and tournament:
+                embeds = both_embeds
+            elif weekly:
+                embeds = weekly_embeds
+            else:
+                embeds = tournament_embeds
 
-            to_send.append(self.dispatcher(webhook=webhook, embeds=[embed], config=conf))
+            if embeds:
+                to_send.append(self.dispatcher(webhook=webhook, embeds=embeds, config=conf))
 
         await self.handle_dispatch(to_send)
 
-    @tasks.loop(time=datetime.time(hour=8, minute=30, tzinfo=datetime.UTC))
+    @tasks.loop(hours=24 * 7)
     async def fashion_report_loop(self) -> None:
-        now = datetime.datetime.now(datetime.UTC)
-        if now.weekday() != 4:  # friday
-            return
-
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(4, length=64))  # pyright: ignore[reportAssignmentType] # stub shenanigans
-        if not records:
+        configs = self._subscribed_configs(flags=SubscribedEventsFlags.fashion_report.flag)
+        if not configs:
             LOGGER.warning("[EventSub] -> [FashionReport] :: No subscriptions. Exiting.")
             return
 
@@ -517,58 +640,63 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
         fashion_report_cog._reset_state()
         await fashion_report_cog._report_task
         embed = fashion_report_cog.generate_fashion_embed()
+        embeds = [embed] if embed else []
 
-        to_send: list[Coroutine[Any, Any, None]] = []
-
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="[(FashionReport)]")
-
-            if not webhook:
-                continue
-
-            embeds = [embed] if embed else []
-            to_send.append(self.dispatcher(webhook=webhook, embeds=embeds, content=fmt, config=conf))
+        to_send = [
+            self.dispatcher(webhook=webhook, embeds=embeds, content=fmt, config=conf)
+            for conf, webhook in await self._resolve_webhooks(configs, log_key="[(FashionReport)]")
+        ]
 
         await self.handle_dispatch(to_send)
 
     @tasks.loop(hours=2)
     async def ocean_fishing_loop(self) -> None:
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(8, length=64))  # pyright: ignore[reportAssignmentType] # stubs
-        if not records:
+        # ocean fishing and the TT open tournament share a schedule, so serve both sets of subscribers in one pass
+        configs = self._subscribed_configs(
+            flags=SubscribedEventsFlags.ocean_fishing.flag | SubscribedEventsFlags.open_tournament.flag,
+        )
+        if not configs:
             LOGGER.warning("[EventSub] -> [OceanFishing] :: No subscriptions. Exiting.")
             return
 
+        now = datetime.datetime.now(datetime.UTC)
+        ocean_fishing_embeds: list[discord.Embed] = []
+        tournament_embeds: list[discord.Embed] = []
+
         ocean_fishing_cog: OceanFishingCog | None = self.bot.get_cog("OceanFishing")  # pyright: ignore[reportAssignmentType] # cog downcasting
-        if not ocean_fishing_cog:
+        if ocean_fishing_cog:
+            ocean_fishing_embeds.extend(ocean_fishing_cog._generate_both_embeds(now))
+        else:
             LOGGER.error("[EventSub] -> [Ocean Fishing] :: No ocean fishing cog available.")
+
+        tt_cog: TripleTriad | None = self.bot.get_cog("TripleTriad")  # pyright: ignore[reportAssignmentType] # cog downcasting
+        if tt_cog:
+            tournament_embeds.append(tt_cog.generate_open_tournament_embed(now))
+        else:
+            LOGGER.error("[EventSub] -> [TT OpenTournament] :: Could not load the Triple Triad cog.")
+
+        if not ocean_fishing_embeds and not tournament_embeds:
             return
 
-        now = datetime.datetime.now(datetime.UTC)
-        embeds = ocean_fishing_cog._generate_both_embeds(now)
+        # guilds subscribed to both get a single message carrying both sets of embeds
+        both_embeds = ocean_fishing_embeds + tournament_embeds
 
         to_send: list[Coroutine[Any, Any, None]] = []
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="[(OceanFishing)]")
+        for conf, webhook in await self._resolve_webhooks(configs, log_key="[(OceanFishing)]"):
+            ocean_fishing = conf.subscriptions.ocean_fishing
+            tournament = conf.subscriptions.open_tournament
+            if ocean_fishing and tournament:
+                embeds = both_embeds
+            elif ocean_fishing:
+                embeds = ocean_fishing_embeds
+            else:
+                embeds = tournament_embeds
 
-            if not webhook:
+            if not embeds:
                 continue
 
-            to_send.append(
-                self.dispatcher(
-                    content="You can view Lulu's helpful tools on Ocean Fishing data [here](https://ffxiv.pf-n.co/ocean-fishing)!",
-                    webhook=webhook,
-                    embeds=embeds,
-                    config=conf,
-                ),
-            )
+            content = OCEAN_FISHING_CONTENT if ocean_fishing and ocean_fishing_embeds else MISSING
+            to_send.append(self.dispatcher(content=content, webhook=webhook, embeds=embeds, config=conf))
 
         await self.handle_dispatch(to_send)
 
@@ -583,33 +711,19 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
             return
 
         region, bitstring_value = await resets._wait_for_next_cactpot(now)
-        embed = resets._get_cactpot_embed(region)
-
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(
-            query,
-            BitString.from_int(bitstring_value, length=64),
-        )  # pyright: ignore[reportAssignmentType] # stub shenanigans
+        configs = self._subscribed_configs(flags=bitstring_value)
 
-        if not records:
+        if not configs:
             LOGGER.warning("[EventSub] -> [JumboCactpot] :: No subscriptions. Exiting.")
             return
 
-        to_send: list[Coroutine[Any, Any, None]] = []
-
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="[EventSub] -> [Delete]")
-
-            if not webhook:
-                continue
+        embed = resets._get_cactpot_embed(region)
+        embeds = [embed]
 
-            to_send.append(self.dispatcher(embeds=[embed], webhook=webhook, config=conf))
+        to_send = [
+            self.dispatcher(embeds=embeds, webhook=webhook, config=conf)
+            for conf, webhook in await self._resolve_webhooks(configs, log_key="[EventSub] -> [Delete]")
+        ]
 
         await self.handle_dispatch(to_send)
 
@@ -617,15 +731,9 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
     async def gate_loop(self) -> None:
         now = datetime.datetime.now(datetime.UTC)
 
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(256, length=64))  # pyright: ignore[reportAssignmentType] # stub shenanigans
+        configs = self._subscribed_configs(flags=SubscribedEventsFlags.gate.flag)
 
-        if not records:
+        if not configs:
             LOGGER.warning("[EventSub] -> [GATEs] :: No subscriptions. Exiting.")
             return
 
@@ -635,93 +743,12 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
             return
 
         embed = gates_cog.generate_gate_embed(now)
+        embeds = [embed]
 
-        to_send: list[Coroutine[Any, Any, None]] = []
-
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="([GATEs])")
-
-            if not webhook:
-                continue
-
-            to_send.append(self.dispatcher(webhook=webhook, embeds=[embed], config=conf))
-
-        await self.handle_dispatch(to_send)
-
-    @tasks.loop(hours=2)
-    async def open_tournament_loop(self) -> None:
-        now = datetime.datetime.now(datetime.UTC)
-
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(512, length=64))  # pyright: ignore[reportAssignmentType] # stub shenanigans
-
-        if not records:
-            LOGGER.warning("[EventSub] -> [TT OpenTournament] :: No subscriptions. Exiting.")
-            return
-
-        tt_cog: TripleTriad | None = self.bot.get_cog("TripleTriad")  # pyright: ignore[reportAssignmentType] # cog downcasting
-        if not tt_cog:
-            LOGGER.error("[EventSub] -> [TT OpenTournament] :: Could not load the Triple Triad cog.")
-            return
-
-        embed = tt_cog.generate_open_tournament_embed(now)
-
-        to_send: list[Coroutine[Any, Any, None]] = []
-
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="([TT OpenTournament])")
-
-            if not webhook:
-                await conf.delete()
-                continue
-
-            to_send.append(self.dispatcher(webhook=webhook, embeds=[embed], config=conf))
-
-        await self.handle_dispatch(to_send)
-
-    @tasks.loop(time=WEEKLY_RESET_REMINDER_TIME)
-    async def tt_tournament_loop(self) -> None:
-        now = datetime.datetime.now(datetime.UTC)
-        if now.weekday() != 1:  # tuesday
-            return
-
-        query = """
-                SELECT *
-                FROM event_remind_subscriptions
-                WHERE subscriptions & $1 = $1;
-                """
-
-        records: list[SubscriptionEventRecord] = await self.bot.pool.fetch(query, BitString.from_int(1024, length=64))  # pyright: ignore[reportAssignmentType] # stub shenanigans
-
-        if not records:
-            LOGGER.warning("[EventSub] -> [TT Tournament] :: No subscriptions. Exiting.")
-            return
-
-        tt_cog: TripleTriad | None = self.bot.get_cog("TripleTriad")  # pyright: ignore[reportAssignmentType] # cog downcasting
-        if not tt_cog:
-            LOGGER.error("[EventSub] -> [TT Tournament] :: Could not load the Triple Triad cog.")
-            return
-
-        embed = tt_cog.generate_tournament_embed(now)
-
-        to_send: list[Coroutine[Any, Any, None]] = []
-
-        for record in records:
-            conf = await self.get_sub_config(record["guild_id"])
-            webhook = await self._resolve_webhook_from_cache(conf, log_key="([TT Tournament])")
-
-            if not webhook:
-                await conf.delete()
-                continue
-
-            to_send.append(self.dispatcher(webhook=webhook, embeds=[embed], config=conf))
+        to_send = [
+            self.dispatcher(webhook=webhook, embeds=embeds, config=conf)
+            for conf, webhook in await self._resolve_webhooks(configs, log_key="([GATEs])")
+        ]
 
         await self.handle_dispatch(to_send)
 
@@ -740,46 +767,41 @@ class EventSubscriptions(BaseCog["Graha"], group_name="subscription"):
         next_time -= datetime.timedelta(minutes=5)
 
         LOGGER.info("[EventSub] -> [Pre-GATEs] :: Sleeping until %s", next_time)
-        await discord.utils.sleep_until(next_time)
+        await _sleep_until(next_time)
         LOGGER.info("[EventSub] -> [Pre-GATEs] :: Woke up at %s", datetime.datetime.now(datetime.UTC))
 
     @ocean_fishing_loop.before_loop
     async def ocean_fishing_before_loop(self) -> None:
         await self.bot.wait_until_ready()
 
-        now = datetime.datetime.now(datetime.UTC)
-        then = now + datetime.timedelta(hours=1) if now.hour % 2 == 0 else now
-
-        if then.minute >= 45:
-            # exceeded warning time, alert on next
-            then += datetime.timedelta(hours=2)
-        then = then.replace(minute=45, second=0, microsecond=0)
+        then = self._resolve_next_bihourly_warning()
 
         LOGGER.info("[EventSub] -> [OceanFishing] :: Sleeping until %s", then)
-        await discord.utils.sleep_until(then)
+        await _sleep_until(then)
         LOGGER.info("[EventSub] -> [OceanFishing] :: Woken up at %s", then)
 
-    @open_tournament_loop.before_loop
-    async def open_tournament_before_loop(self) -> None:
+    @weekly_reset_loop.before_loop
+    async def weekly_before_loop(self) -> None:
         await self.bot.wait_until_ready()
 
-        now = datetime.datetime.now(datetime.UTC)
-        then = now + datetime.timedelta(hours=1) if now.hour % 2 == 0 else now
+        then = self._resolve_next_weekly(WEEKLY_REMINDER_WEEKDAY, WEEKLY_RESET_REMINDER_TIME)
 
-        if then.minute >= 45:
-            # exceeded warning time, alert on next
-            then += datetime.timedelta(hours=2)
-        then = then.replace(minute=45, second=0, microsecond=0)
+        LOGGER.info("[EventSub] -> [Weekly] :: Sleeping until %s", then)
+        await _sleep_until(then)
+        LOGGER.info("[EventSub] -> [Weekly] :: Woken up at %s", then)
 
-        LOGGER.info("[EventSub] -> [TT OpenTournament] :: Sleeping until %s", then)
-        await discord.utils.sleep_until(then)
-        LOGGER.info("[EventSub] -> [TT OpenTournament] :: Woken up at %s", then)
+    @fashion_report_loop.before_loop
+    async def fashion_report_before_loop(self) -> None:
+        await self.bot.wait_until_ready()
+
+        then = self._resolve_next_weekly(FASHION_REPORT_REMINDER_WEEKDAY, FASHION_REPORT_REMINDER_TIME)
+
+        LOGGER.info("[EventSub] -> [FashionReport] :: Sleeping until %s", then)
+        await _sleep_until(then)
+        LOGGER.info("[EventSub] -> [FashionReport] :: Woken up at %s", then)
 
     @jumbo_cactpot_loop.before_loop
-    @weekly_reset_loop.before_loop
     @daily_reset_loop.before_loop
-    @fashion_report_loop.before_loop
-    @tt_tournament_loop.before_loop
     async def before_loop(self) -> None:
         await self.bot.wait_until_ready()
 
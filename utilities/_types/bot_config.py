@@ -34,6 +34,10 @@ class MiscConfig(TypedDict):
     mystbin_token: str
 
 
+class SubscriptionsConfig(TypedDict):
+    max_concurrent_dispatches: NotRequired[int]
+
+
 class Config(TypedDict):
     bot: BotConfig
     database: DatabaseConfig
@@ -41,3 +45,4 @@ class Config(TypedDict):
     misc: MiscConfig
     reddit: RedditConfig
     conditional_access: NotRequired[dict[str, list[int]]]
+    subscriptions: NotRequired[SubscriptionsConfig]
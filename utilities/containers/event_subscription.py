@@ -18,6 +18,8 @@ from utilities.shared.cache import cache
 if TYPE_CHECKING:
     from typing import Self
 
+    from asyncpg import Record
+
     from bot import Graha
     from utilities.shared._types.xiv.record_aliases.subscription import EventRecord
     from utilities.shared._types.xiv.record_aliases.webhooks import WebhooksRecord
@@ -44,6 +46,7 @@ class NoWebhookFound(Exception):
 class EventSubConfig:
     __slots__ = (
         "_bot",
+        "_webhook",
         "channel_id",
         "daily_role_id",
         "fashion_report_role_id",
@@ -92,6 +95,7 @@ class EventSubConfig:
         self.tt_open_tournament_role_id: int | None = tt_open_tournament_role_id
         self.tt_tournament_role_id: int | None = tt_tournament_role_id
         self.webhook_id: int | None = webhook_id
+        self._webhook: discord.Webhook | None = None
 
     def __repr__(self) -> str:
         return f"<EventSubConfig guild_id={self.guild_id}>"
@@ -115,6 +119,25 @@ class EventSubConfig:
             webhook_id=record["webhook_id"],
         )
 
+    @classmethod
+    def from_joined_record(cls, bot: Graha, /, *, record: Record) -> Self:
+        config = cls.from_record(bot, record=record)  # pyright: ignore[reportArgumentType] # superset of EventRecord
+        if record["webhook_token"]:
+            config._webhook = config._webhook_from_record(record)  # pyright: ignore[reportArgumentType] # see above
+
+        return config
+
+    @classmethod
+    async def fetch_all(cls, bot: Graha, /) -> list[Self]:
+        query = """
+                SELECT s.*, w.webhook_url, w.webhook_token
+                FROM event_remind_subscriptions s
+                LEFT JOIN webhooks w USING (guild_id);
+                """
+
+        records: list[Record] = await bot.pool.fetch(query)
+        return [cls.from_joined_record(bot, record=record) for record in records]
+
     @classmethod
     def with_webhook(cls, bot: Graha, /, *, guild_id: int, webhook: discord.Webhook) -> Self:
         return cls(bot, guild_id=guild_id, webhook_id=webhook.id)
@@ -203,8 +226,9 @@ class EventSubConfig:
 
         return None
 
-    async def _create_or_replace_webhook(self) -> discord.Webhook:
-        if not self.channel:
+    async def _create_webhook(self, *, channel: discord.TextChannel | None = None) -> discord.Webhook:
+        channel = channel or self.channel
+        if not channel:
             raise MisconfiguredSubscription(self)
 
         fetch_query = """
@@ -226,7 +250,10 @@ class EventSubConfig:
                 # we can't do anything here.
                 raise MisconfiguredSubscription(self, "Unable to delete webhooks within guild.") from err
 
-        webhook = await self.channel.create_webhook(name="XIV Timers", reason="Created via G'raha Tia subscriptions!")
+        return await channel.create_webhook(name="XIV Timers", reason="Created via G'raha Tia subscriptions!")
+
+    async def _create_or_replace_webhook(self) -> discord.Webhook:
+        webhook = await self._create_webhook()
         query = """
                 INSERT INTO webhooks (guild_id, webhook_id, webhook_url, webhook_token)
                 VALUES ($1, $2, $3, $4)
@@ -243,19 +270,28 @@ class EventSubConfig:
 
         return webhook
 
+    async def _fetch_webhook(self) -> discord.Webhook | None:
+        query = "SELECT * FROM webhooks WHERE guild_id = $1 OR webhook_id = $2;"
+        record: WebhooksRecord | None = await self._bot.pool.fetchrow(query, self.guild_id, self.webhook_id)  # pyright: ignore[reportAssignmentType] # stubs
+        if not record:
+            return None
+
+        return self._webhook_from_record(record)
+
+    def _webhook_from_record(self, record: WebhooksRecord, /) -> discord.Webhook:
+        url = record["webhook_url"] or (
+            f"https://discord.com/api/webhooks/{record['webhook_id']}/" + record["webhook_token"]
+        )
+
+        return discord.Webhook.from_url(url, client=self._bot)
+
     @cache(ignore_kwargs=True)
     async def get_webhook(self, *, recreate: bool = True) -> discord.Webhook:
-        if self.guild_id or self.webhook_id:
-            query = "SELECT * FROM webhooks WHERE guild_id = $1 OR webhook_id = $2;"
-            record: WebhooksRecord | None = await self._bot.pool.fetchrow(query, self.guild_id, self.webhook_id)  # pyright: ignore[reportAssignmentType] # stubs
-            if not record:
-                return await self._create_or_replace_webhook()
+        if self._webhook:
+            return self._webhook
 
-            url = record["webhook_url"] or (
-                f"https://discord.com/api/webhooks/{record['webhook_id']}/" + record["webhook_token"]
-            )
-
-            return discord.Webhook.from_url(url, client=self._bot)
+        if self.guild_id or self.webhook_id:
+            return await self._fetch_webhook() or await self._create_or_replace_webhook()
 
         if not recreate:
             raise NoWebhookFound(self)